@@ -1,23 +1,63 @@
+import contextlib
 import sqlite3
+import threading
 
 from code_garden import config
 
 
 class Connector:
-    def __init__(self):
-        self.db = sqlite3.connect(config.HOME_DIR / "todos.db", check_same_thread=False)
+    def __init__(self, schema=()):
+        self.schema = schema
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = set()
+
+    @property
+    def db(self):
+        """Connection for the current thread, opened (and the database set up) on first use."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            path = config.HOME_DIR / "todos.db"
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            # synchronous and temp_store are per-connection; journal_mode is stored in the file.
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA temp_store=MEMORY")
+            with self._init_lock:
+                if path not in self._initialized:
+                    db.execute("PRAGMA journal_mode=WAL")
+                    for i in self.schema:
+                        db.execute(i)
+                    self._initialized.add(path)
+            self._local.db = db
+        return db
+
+    def close(self):
+        """Close the current thread's connection, if one was opened."""
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
 
     def write(self, stmt: str, params=()):
-        with self.db as db:
-            cursor = db.cursor()
-            cursor.execute(stmt, params)
+        self.db.execute(stmt, params)
 
     def read(self, stmt: str, params=()):
-        results = None
-        with self.db as db:
-            cursor = db.cursor()
-            cursor.execute(stmt, params)
+        return self.db.execute(stmt, params).fetchall()
 
-            results = cursor.fetchall()
+    def iterate(self, stmt: str, params=(), size: int = 100):
+        cursor = self.db.cursor()
+        cursor.execute(stmt, params)
+        while rows := cursor.fetchmany(size):
+            yield from rows
 
-        return results
+    @contextlib.contextmanager
+    def transaction(self):
+        """Group several writes into a single transaction (autocommit otherwise)."""
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
@@ -1,16 +1,56 @@
+import concurrent.futures
 import datetime
+import functools
 import json
+import os
+import random
+import re
+import shlex
 import shutil
 import subprocess
+import threading
+from pathlib import Path
 
 import markdown
-import requests
 
 from code_garden.readme import Readme
-from code_garden.todos import Todo
+from code_garden.todos import Todo, conn
+from code_garden.words import ADJECTIVES, NOUNS
 
 from . import config
 
+# Caps concurrent subprocesses (and their pipes) when many Repositories hydrate at once.
+_GIT_CONCURRENCY = 16
+_git_slots = threading.BoundedSemaphore(_GIT_CONCURRENCY)
+
+
+@functools.lru_cache(maxsize=256)
+def _render_md(path: str, mtime: int, size: int):
+    """Read and render a Markdown file; mtime and size key the cache so edits invalidate it."""
+    raw = Path(path).read_text()
+    return raw, markdown.markdown(raw)
+
+
+class _memoized(object):
+    """Per-instance cached property.
+
+    functools.cached_property on Python < 3.12 holds one lock shared by every instance,
+    which would serialize Repositories hydrating on different threads.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
 
 class Repository(object):
     """A Git repository object.
@@ -29,8 +69,42 @@ class Repository(object):
 
     """
 
+    _BRANCH_FORMAT = (
+        "%(HEAD)%09%(refname:short)%09%(upstream:short)%09%(upstream:track,nobracket)"
+    )
+    _SNAPSHOT_SEP = "\n---\n"
+    _SNAPSHOT_SCRIPT = "; printf '\\n---\\n'; ".join(
+        [
+            # ahead-behind needs git 2.41+; older versions fall back to per-branch counts.
+            f"git for-each-ref --format='{_BRANCH_FORMAT}%09%(ahead-behind:master)' refs/heads/ 2>/dev/null"
+            f" || git for-each-ref --format='{_BRANCH_FORMAT}' refs/heads/",
+            "git log -z -20 --format=%s%x00%at%x00%h%x00%an",
+            "git status --porcelain=v2 -z --no-renames",
+            "git remote -v",
+            "git stash list",
+            "git symbolic-ref -q --short HEAD"
+            " || printf '(HEAD detached at %s)\\n' \"$(git rev-parse --short HEAD)\"",
+        ]
+    )
+
+    # Git and file state; todos are left out so the database is only read on the calling thread.
+    _HYDRATED = [
+        "_branch_table",
+        "branches",
+        "stashes",
+        "current_branch",
+        "log",
+        "diffs",
+        "readme",
+        "ignored",
+        "remote_url",
+    ]
+    _CACHED = _HYDRATED + ["todos"]
+
     def __init__(self, name: str):
         self.name = name
+        self._snapshot_raw = None
+        self._snapshot_lock = threading.Lock()
 
     @property
     def path(self):
@@ -42,125 +116,184 @@ class Repository(object):
         Args:
             cmd (list): List of arguments in the command. (splitting whitespace on text is recommended)
         """
-        return subprocess.run(cmd, cwd=self.path, text=True, capture_output=True).stdout
+        with _git_slots:
+            return subprocess.run(
+                cmd, cwd=self.path, text=True, capture_output=True
+            ).stdout
 
-    @property
+    def _snapshot(self):
+        """Collect the output of all read-only git commands in a single subprocess.
+
+        Sections are separated by a sentinel line and cached on the instance, keyed
+        as branches, log, status, remote, stash and head.
+        """
+        with self._snapshot_lock:
+            if self._snapshot_raw is None:
+                sections = self.run_command(
+                    ["sh", "-c", self._SNAPSHOT_SCRIPT]
+                ).split(self._SNAPSHOT_SEP)
+                self._snapshot_raw = dict(
+                    zip(
+                        ["branches", "log", "status", "remote", "stash", "head"],
+                        sections,
+                    )
+                )
+            return self._snapshot_raw
+
+    def invalidate(self):
+        """Drop cached git and file state so the next read reflects changes made on disk."""
+        self._snapshot_raw = None
+        for i in self._CACHED:
+            self.__dict__.pop(i, None)
+
+    @_memoized
+    def _branch_table(self):
+        """Map each local branch name to (is checked out, commits differing from master).
+
+        The count is None when the snapshot could not provide it, in which case
+        Branch.compare_with_master computes it on demand.
+        """
+        table = {}
+        for i in self._snapshot()["branches"].split("\n"):
+            if not i:
+                continue
+            head, name, upstream, track, *ahead_behind = i.split("\t")
+            if name == "master":
+                count = (
+                    sum(int(n) for n in re.findall(r"\d+", track))
+                    if upstream == "origin/master"
+                    else None
+                )
+            else:
+                count = (
+                    sum(int(n) for n in ahead_behind[0].split()) if ahead_behind else None
+                )
+            table[name] = (head == "*", count)
+        return table
+
+    @_memoized
     def branches(self):
+        # The checked-out row shares current_branch's comparison rather than running its own.
         return [
-            Branch(self.name, i.strip())
-            for i in self.run_command(["git", "branch"]).split("\n")
-            if i.strip()
+            Branch(self.name, f"* {name}", self.current_branch.compare_with_master)
+            if is_head
+            else Branch(self.name, name, count)
+            for name, (is_head, count) in self._branch_table.items()
         ]
 
-    @property
+    @_memoized
     def stashes(self):
         return [
             i.strip().split(":")[2]
-            for i in self.run_command(["git", "stash", "list"]).split("\n")
+            for i in self._snapshot()["stash"].split("\n")
             if i.strip()
         ]
 
-    @property
+    @_memoized
     def current_branch(self):
-        for i in self.run_command(["git", "branch"]).split("\n"):
-            if i.startswith("* "):
-                return Branch(self.name, i.replace("* ", ""))
+        name = self._snapshot()["head"].strip()
+        return Branch(self.name, name, self._branch_table.get(name, (True, None))[1])
 
-    @property
+    @_memoized
     def log(self):
         _ = []
-        try:
-            for i in self.run_command(
-                ["git", "log", "--oneline", "-20", "--pretty=format:%s\t%at\t%h\t%an"]
-            ).split("\n"):
-                if len(i.strip().split("\t")) == 2:
-                    _.append(
-                        LogItem(
-                            self.name,
-                            "[No Commit Message]",
-                            datetime.datetime.min,
-                            i.strip().split("\t")[0],
-                            i.strip().split("\t")[1],
-                        )
-                    )
-                else:
-                    _.append(
-                        LogItem(
-                            self.name,
-                            i.strip().split("\t")[0],
-                            datetime.datetime.fromtimestamp(int(i.split("\t")[1])),
-                            i.strip().split("\t")[2],
-                            i.strip().split("\t")[3],
-                        )
-                    )
+        parts = iter(self._snapshot()["log"].split("\x00"))
+        for name, timestamp, abbrev_hash, author in zip(parts, parts, parts, parts):
+            _.append(
+                LogItem(
+                    self.name,
+                    name or "[No Commit Message]",
+                    datetime.datetime.fromtimestamp(int(timestamp)),
+                    abbrev_hash,
+                    author,
+                )
+            )
 
-            return _
-        except:
-            return []
+        return _
 
-    @property
+    @_memoized
     def todos(self):
         return Todo.see_list(self.name)
 
-    @property
+    @_memoized
     def diffs(self):
-        return [
-            DiffItem(
-                self.name, (self.path / i.strip().split()[1]).name, i.strip().split()[0]
-            )
-            for i in self.run_command(["git", "status", "--short"]).split("\n")
-            if i.strip()
-        ]
-
-    @property
+        _ = []
+        for i in self._snapshot()["status"].split("\x00"):
+            if not i:
+                continue
+            # Porcelain v2 records: "1 XY ... path" (changed), "u XY ... path" (unmerged), "? path" (untracked).
+            if i[0] == "?":
+                type_, raw_path = "??", i[2:]
+            else:
+                fields = i.split(" ", 10 if i[0] == "u" else 8)
+                type_, raw_path = fields[1].replace(".", ""), fields[-1]
+            _.append(DiffItem(self.name, os.path.basename(raw_path.rstrip("/")), type_))
+
+        return _
+
+    @_memoized
     def readme(self):
+        path = self.path / "README.md"
+        if not path.is_file():
+            return {}
         try:
-            raw = open(self.path / "README.md").read()
-            return dict(txt=raw, md=markdown.markdown(raw))
-        except:
+            st = path.stat()
+            txt, md = _render_md(str(path), st.st_mtime_ns, st.st_size)
+        except (OSError, UnicodeDecodeError):
             return {}
+        return dict(txt=txt, md=md)
 
-    @property
+    @_memoized
     def ignored(self):
+        path = self.path / ".gitignore"
+        if not path.is_file():
+            return []
         try:
-            return [
-                IgnoreItem(self.name, i.strip())
-                for i in open(self.path / ".gitignore").readlines()
-                if i.strip()
-            ]
-        except:
+            raw = path.read_text()
+        except (OSError, UnicodeDecodeError):
             return []
+        return [IgnoreItem(self.name, i.strip()) for i in raw.splitlines() if i.strip()]
 
-    @property
+    @_memoized
     def remote_url(self):
-        return (
-            self.run_command(["git", "remote", "-v"]).split("\n")[0].split()[1]
-            if self.run_command(["git", "remote", "-v"])
-            else None
-        )
+        out = self._snapshot()["remote"].strip()
+        return out.split("\n")[0].split()[1] if out else None
+
+    @classmethod
+    def _discover(cls):
+        return [
+            cls(i.name)
+            for i in config.HOME_DIR.iterdir()
+            if i.is_dir() and (i / ".git").exists()
+        ]
 
     @classmethod
     def all(cls):
         """Get all Repositories in the home directory."""
-        return sorted(
-            [
-                Repository(i.name)
-                for i in config.HOME_DIR.iterdir()
-                if i.is_dir() and (i / ".git").exists()
-            ],
-            key=lambda x: x.log[0].timestamp,
-            reverse=True,
-        )
+        return sorted(cls._discover(), key=lambda x: x.log[0].timestamp, reverse=True)
+
+    @classmethod
+    def all_hydrated(cls):
+        """Get all Repositories in the home directory with their state already loaded.
+
+        Repositories are hydrated in parallel and their todos come from a single query.
+        """
+        repositories_ = cls._discover()
+        todos_ = Todo.see_all()
+        for i in repositories_:
+            i.todos = todos_.get(i.name, [])
+
+        # Hydration waits on git, not the CPU, so size the pool to the subprocess cap.
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=_GIT_CONCURRENCY
+        ) as executor:
+            list(executor.map(cls.hydrate, repositories_))
+
+        return sorted(repositories_, key=lambda x: x.log[0].timestamp, reverse=True)
 
     @classmethod
     def generate_name(cls):
-        adj = requests.get(
-            "https://random-word-form.herokuapp.com/random/adjective"
-        ).json()[0]
-        noun = requests.get(
-            "https://random-word-form.herokuapp.com/random/noun"
-        ).json()[0]
-        return f"{adj}-{noun}"
+        return f"{random.choice(ADJECTIVES)}-{random.choice(NOUNS)}"
 
     def init(self, brief_descrip: str):
         """Create a new Repository.
@@ -174,8 +307,10 @@ class Repository(object):
         for i in files:
             (self.path / i).touch()
 
-        self.run_command(["git", "init"])
-        self.commit("Initial commit")
+        self.run_command(
+            ["sh", "-c", "git init && git add -A && git commit -m 'Initial commit'"]
+        )
+        self.invalidate()
 
     @classmethod
     def clone(cls, url: str):
@@ -196,7 +331,8 @@ class Repository(object):
         Args:
             content (str): New plaintext content of the README.
         """
-        open((self.path / "README.md"), "w").write(content)
+        (self.path / "README.md").write_text(content)
+        self.invalidate()
 
     def commit(self, msg: str):
         """Commit all local changes to git.
@@ -204,33 +340,39 @@ class Repository(object):
         Args:
             msg (str): Commit message.
         """
-        self.run_command(["git", "add", "-A"])
-        self.run_command(["git", "commit", "-am", msg])
+        self.run_command(["sh", "-c", f"git add -A && git commit -am {shlex.quote(msg)}"])
+        self.invalidate()
 
     def reset_all(self):
         """Discard all local changes, reset Repository to most recent commit."""
         self.run_command(["git", "checkout", "."])
         self.run_command(["git", "clean", "-fd"])
+        self.invalidate()
 
     def push(self):
         """Push to remote branch."""
         self.run_command(["git", "push", "origin"])
+        self.invalidate()
 
     def stash(self):
         """Stash changes."""
         self.run_command(["git", "stash", "push", "-u"])
+        self.invalidate()
 
     def unstash(self, id_):
         """Unstash changes."""
         self.run_command(["git", "stash", "pop", str(id_)])
+        self.invalidate()
 
     def drop_stash(self, id_):
         """Unstash changes."""
         self.run_command(["git", "stash", "drop", str(id_)])
+        self.invalidate()
 
     def pull(self):
         """Pull from remote."""
         self.run_command(["git", "pull", "--all"])
+        self.invalidate()
 
     def export(self):
         """Export all Repository info, such as todos, to single JSON file."""
@@ -240,21 +382,32 @@ class Repository(object):
     def export_todos(self):
         """Export all todos to single JSON file."""
         results = {"todos": [i.to_dict() for i in self.todos]}
-        json.dump(results, open(self.path / "todos.json", "w"), indent=4)
+        with open(self.path / "todos.json", "w") as f:
+            json.dump(results, f, indent=4)
 
     def import_todos(self):
         """Import todos from a JSON file."""
-        results = json.load(open(self.path / "todos.json")).get("todos")
-        for i in results:
-            todo_ = Todo(
-                i.get("name"),
-                i.get("description"),
-                i.get("tag"),
-                datetime.datetime.now(),
-                i.get("status"),
-                self.name,
-            )
-            todo_.add()
+        with open(self.path / "todos.json") as f:
+            results = json.load(f).get("todos")
+        with conn.transaction():
+            for i in results:
+                todo_ = Todo(
+                    i.get("name"),
+                    i.get("description"),
+                    i.get("tag"),
+                    datetime.datetime.now(),
+                    i.get("status"),
+                    self.name,
+                )
+                todo_.add()
+
+    def hydrate(self):
+        """Load all cached git and file state for this Repository."""
+        for i in self._HYDRATED:
+            getattr(self, i)
+        # Without ahead-behind support each branch falls back to its own git log.
+        for i in self.branches:
+            i.compare_with_master
 
     def to_dict(self):
         """Get a dict representation of the Repository object (for API usage)."""
@@ -284,9 +437,11 @@ class Branch(object):
         name (str): name of this branch.
     """
 
-    def __init__(self, repository, name):
+    def __init__(self, repository, name, compare_with_master=None):
         self.repository = repository
         self.name = name
+        if compare_with_master is not None:
+            self.compare_with_master = compare_with_master
 
     def create(self):
         """Create a new branch."""
@@ -300,7 +455,7 @@ class Branch(object):
         """Checkout this branch."""
         Repository(self.repository).run_command(["git", "checkout", self.name])
 
-    @property
+    @_memoized
     def compare_with_master(self):
         """Compare this branch to master."""
         comparison = Repository(self.repository).run_command(
@@ -428,9 +583,9 @@ class IgnoreItem(object):
         ignores_ = Repository(self.repository).ignored
         ignores_.append(self)
 
-        with open((Repository(self.repository).path / ".gitignore"), "w") as f:
-            for i in ignores_:
-                f.write(f"{i.name}\n")
+        (Repository(self.repository).path / ".gitignore").write_text(
+            "".join(f"{i.name}\n" for i in ignores_)
+        )
 
     @classmethod
     def delete(cls, repository, id):
@@ -443,9 +598,9 @@ class IgnoreItem(object):
         ignores_ = Repository(repository).ignored
         del ignores_[id]
 
-        with open((Repository(repository).path / ".gitignore"), "w") as f:
-            for i in ignores_:
-                f.write(f"{i.name}\n")
+        (Repository(repository).path / ".gitignore").write_text(
+            "".join(f"{i.name}\n" for i in ignores_)
+        )
 
     def to_dict(self):
         """Get a dict representation of this object (for API use)."""
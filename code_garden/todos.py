@@ -7,14 +7,18 @@ import click
 
 from code_garden.database import Connector
 
-conn = Connector()
-conn.write(
-    "CREATE TABLE IF NOT EXISTS todos (title TEXT, description TEXT, tag TEXT, date_added DATETIME, status TEXT, repo TEXT, id INTEGER PRIMARY KEY AUTOINCREMENT)"
+conn = Connector(
+    schema=[
+        "CREATE TABLE IF NOT EXISTS todos (title TEXT, description TEXT, tag TEXT, date_added DATETIME, status TEXT, repo TEXT, id INTEGER PRIMARY KEY AUTOINCREMENT)",
+        "CREATE INDEX IF NOT EXISTS ix_todos_repo_status ON todos (repo, status)",
+    ]
 )
 
 
 class Todo:
     status_options = {"open": "cyan", "active": "yellow", "completed": "blue"}
+    # Active first, then open, then completed; newest first within each group.
+    _ORDER_BY = "ORDER BY status IS 'completed', status IS NOT 'active', id DESC"
 
     def __init__(
         self,
@@ -57,18 +61,34 @@ class Todo:
             result[0], result[1], result[2], result[3], result[4], result[5], result[6]
         )
 
+    @classmethod
+    def iter_list(cls, repo, include_completed=True):
+        """Yield a repo's todos in display order, fetching rows in pages."""
+        where = (
+            "repo=?" if include_completed else "repo=? AND status IS NOT 'completed'"
+        )
+        for i in conn.iterate(
+            f"SELECT title, description, tag, date_added, status, repo, id FROM todos WHERE {where} {cls._ORDER_BY}",
+            (repo,),
+        ):
+            yield Todo(i[0], i[1], i[2], i[3], i[4], i[5], i[6])
+
     @classmethod
     def see_list(cls, repo):
+        return list(cls.iter_list(repo))
+
+    @classmethod
+    def see_all(cls):
+        """Get the todos of every repo in a single query, grouped by repo name."""
         results = conn.read(
-            "SELECT title, description, tag, date_added, status, repo, id FROM todos WHERE repo=?",
-            (repo,),
+            f"SELECT title, description, tag, date_added, status, repo, id FROM todos {cls._ORDER_BY}"
         )
-        n = sorted(
-            [Todo(i[0], i[1], i[2], i[3], i[4], i[5], i[6]) for i in results],
-            key=lambda x: x.id,
-            reverse=True,
-        )
-        return sorted(n, key=lambda x: (x.status == "completed", x.status != "active"))
+        grouped = {}
+        for i in results:
+            grouped.setdefault(i[5], []).append(
+                Todo(i[0], i[1], i[2], i[3], i[4], i[5], i[6])
+            )
+        return grouped
 
     def edit(self):
         conn.write(
@@ -128,12 +148,7 @@ def add_todo(title: str, desc, tag, fixup):
 )
 def view_todos(all):
     """See list of all undone todos."""
-    _ = (
-        Todo.see_list(Path.cwd().name)
-        if all
-        else [i for i in Todo.see_list(Path.cwd().name) if i.status != "completed"]
-    )
-    for i in _:
+    for i in Todo.iter_list(Path.cwd().name, include_completed=all):
         click.secho(str(i), fg=Todo.status_options.get(i.status))
 
 
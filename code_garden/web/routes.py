@@ -3,12 +3,17 @@ from pathlib import Path
 
 from flask import current_app, render_template, request
 
-from code_garden.todos import Todo
+from code_garden.todos import Todo, conn
 
 from .. import config
 from ..models import Branch, DiffItem, IgnoreItem, LogItem, Repository
 
 
+@current_app.teardown_appcontext
+def close_db(exc):
+    conn.close()
+
+
 @current_app.get("/")
 def index():
     return render_template(
@@ -42,7 +47,7 @@ def settings():
 
 @current_app.post("/repositories")
 def repositories():
-    return dict(repositories_=[i.to_dict() for i in Repository.all()])
+    return dict(repositories_=[i.to_dict() for i in Repository.all_hydrated()])
 
 
 @current_app.post("/commit")
@@ -203,9 +208,10 @@ def delete_todo():
 @current_app.post("/clear_completed")
 def clear_completed():
     repo_ = Repository(request.json.get("repo"))
-    for i in repo_.todos:
-        if i.status == "completed":
-            i.delete()
+    with conn.transaction():
+        for i in repo_.todos:
+            if i.status == "completed":
+                i.delete()
 
     return {"status": "done"}
 
@@ -0,0 +1,30 @@
+"""Word lists used to generate placeholder Repository names."""
+
+ADJECTIVES = (
+    "able", "agile", "amber", "ancient", "autumn", "bold", "brave", "breezy", "bright",
+    "brisk", "calm", "careful", "cheerful", "clever", "cosmic", "crimson", "crisp",
+    "curious", "daring", "dawn", "deep", "eager", "early", "electric", "elegant",
+    "emerald", "fancy", "fierce", "fluffy", "frosty", "gentle", "giant", "glad",
+    "golden", "graceful", "grand", "happy", "hidden", "humble", "icy", "jolly", "keen",
+    "kind", "lively", "lone", "lucky", "lunar", "merry", "mighty", "misty", "modern",
+    "noble", "odd", "patient", "plain", "polished", "proud", "purple", "quick", "quiet",
+    "rapid", "rare", "restless", "royal", "rustic", "scarlet", "shy", "silent",
+    "silver", "simple", "sleepy", "smooth", "snowy", "solar", "spicy", "steady",
+    "stormy", "sunny", "swift", "tender", "tidy", "tiny", "tranquil", "twilight",
+    "upbeat", "vast", "velvet", "vivid", "wandering", "warm", "wild", "windy", "wise",
+    "young", "zesty",
+)
+
+NOUNS = (
+    "acorn", "anchor", "apple", "arrow", "badger", "beacon", "bear", "birch", "bison",
+    "breeze", "brook", "canyon", "cedar", "cloud", "comet", "coral", "cricket", "crow",
+    "dawn", "delta", "desert", "dolphin", "dove", "dragon", "eagle", "echo", "ember",
+    "falcon", "fern", "field", "finch", "flame", "forest", "fox", "galaxy", "garden",
+    "glacier", "grove", "harbor", "hawk", "heron", "hill", "island", "jaguar", "jasper",
+    "kettle", "lagoon", "lake", "lantern", "leaf", "lion", "lotus", "maple", "meadow",
+    "meteor", "moon", "moss", "mountain", "night", "oak", "ocean", "orchid", "otter",
+    "owl", "panda", "pebble", "pine", "planet", "pond", "prairie", "quartz", "rabbit",
+    "raven", "reef", "river", "robin", "rock", "sage", "shadow", "shore", "sky",
+    "sparrow", "spruce", "star", "stone", "storm", "stream", "summit", "sun", "thunder",
+    "tiger", "tulip", "valley", "violet", "wave", "willow", "wind", "wolf",
+)
@@ -0,0 +1,159 @@
+import threading
+
+import pytest
+
+from code_garden import config
+from code_garden.models import Repository
+from code_garden.todos import Todo
+
+# Snapshots block until this many are in flight at once, so serial hydration cannot pass.
+PARALLEL = 8
+
+SNAPSHOT = Repository._SNAPSHOT_SEP.join(
+    [
+        "*\tmaster\t\t\n \tfeature\t\t\n",
+        "Initial commit\x001700000000\x00abc1234\x00someone\x00",
+        "",
+        "",
+        "",
+        "master\n",
+    ]
+)
+
+
+@pytest.fixture()
+def fake_git(tmp_path, monkeypatch):
+    """24 fake repositories whose git calls are recorded instead of run."""
+    monkeypatch.setattr(config, "HOME_DIR", tmp_path)
+    monkeypatch.setattr(Todo, "see_all", lambda: {})
+    for i in range(24):
+        (tmp_path / f"repo-{i}" / ".git").mkdir(parents=True)
+
+    calls = []
+    barrier = threading.Barrier(PARALLEL, timeout=10)
+
+    def run_command(self, cmd):
+        calls.append(cmd)
+        if cmd[0] == "sh":
+            barrier.wait()
+            return SNAPSHOT
+        return ""
+
+    monkeypatch.setattr(Repository, "run_command", run_command)
+    return calls
+
+
+def test_all_hydrated_runs_repositories_in_parallel(fake_git):
+    # Raises BrokenBarrierError unless PARALLEL snapshots overlap.
+    repositories_ = Repository.all_hydrated()
+
+    assert len(repositories_) == 24
+    assert all("log" in i.__dict__ for i in repositories_)
+
+
+def test_all_hydrated_warms_branch_comparisons(fake_git):
+    repositories_ = Repository.all_hydrated()
+    # One snapshot plus one fallback git log per branch, per repository.
+    assert len(fake_git) == 24 * 3
+
+    for i in repositories_:
+        i.to_dict()
+    assert len(fake_git) == 24 * 3
+
+
+def repository_with(**sections):
+    """A Repository whose git snapshot is preloaded with the given sections."""
+    repository_ = Repository("parsed")
+    repository_._snapshot_raw = dict(
+        dict(branches="", log="", status="", remote="", stash="", head="master\n"),
+        **sections,
+    )
+    return repository_
+
+
+def test_diffs_porcelain_v2():
+    status = "\x00".join(
+        [
+            "1 .M N... 100644 100644 100644 1111111 1111111 docs/my file.txt",
+            "1 A. N... 000000 100644 100644 0000000 2222222 added.py",
+            "u UU N... 100644 100644 100644 100644 3333333 4444444 5555555 merge me.md",
+            "? new dir/",
+            "? notes .txt",
+            "",
+        ]
+    )
+    diffs = repository_with(status=status).diffs
+
+    assert [(i.name, i.type_) for i in diffs] == [
+        ("my file.txt", "M"),
+        ("added.py", "A"),
+        ("merge me.md", "UU"),
+        ("new dir", "??"),
+        ("notes .txt", "??"),
+    ]
+
+
+def test_log_nul_delimited():
+    log = "tab\tin subject\x001700000100\x00bbbbbbb\x00A. Author\x00\x001700000000\x00aaaaaaa\x00someone\x00"
+    items = repository_with(log=log).log
+
+    assert [(i.name, i.abbrev_hash, i.author) for i in items] == [
+        ("tab\tin subject", "bbbbbbb", "A. Author"),
+        ("[No Commit Message]", "aaaaaaa", "someone"),
+    ]
+    assert items[0].timestamp.timestamp() == 1700000100
+    assert repository_with(log="").log == []
+
+
+def test_branch_table_with_ahead_behind():
+    branches = "*\tmaster\torigin/master\tahead 2, behind 1\t0 0\n \tfeature\t\t\t3 1\n"
+    repository_ = repository_with(branches=branches)
+
+    assert repository_._branch_table == {"master": (True, 3), "feature": (False, 4)}
+    assert [(i.name, i.compare_with_master) for i in repository_.branches] == [
+        ("* master", 3),
+        ("feature", 4),
+    ]
+
+
+def test_branch_table_fallback(monkeypatch):
+    # Without %(ahead-behind:...) support the counts come from a per-branch git log.
+    calls = []
+
+    def run_command(self, cmd):
+        calls.append(cmd[2])
+        return "abc1234 one\ndef5678 two\n"
+
+    monkeypatch.setattr(Repository, "run_command", run_command)
+    branches = "*\tfeature\t\t\n \tmaster\t\t\n"
+    repository_ = repository_with(branches=branches, head="feature\n")
+
+    assert repository_._branch_table == {
+        "feature": (True, None),
+        "master": (False, None),
+    }
+    assert repository_.current_branch.compare_with_master == 2
+    assert [(i.name, i.compare_with_master) for i in repository_.branches] == [
+        ("* feature", 2),
+        ("master", 2),
+    ]
+    assert calls == ["master...feature", "origin/master...master"]
+
+
+def test_current_branch_detached():
+    repository_ = repository_with(
+        branches=" \tmaster\t\t\n", head="(HEAD detached at abc1234)\n"
+    )
+
+    assert repository_.current_branch.name == "(HEAD detached at abc1234)"
+
+
+def test_unreadable_readme_and_gitignore(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "HOME_DIR", tmp_path)
+    (tmp_path / "parsed").mkdir()
+    (tmp_path / "parsed" / "README.md").write_bytes(b"\xff\xfe# not utf-8")
+    (tmp_path / "parsed" / ".gitignore").write_bytes(b"\xff\xfe")
+    repository_ = Repository("parsed")
+
+    assert repository_.readme == {}
+    assert repository_.ignored == []